@@ -4,13 +4,12 @@ import os
 
 # Import your robust backend logic
 from src.database.retriever import get_retriever
-from src.agents.router import route_query
-from src.agents.concept_agent import generate_explanation
-from src.agents.quiz_agent import generate_quiz
+from src.agents.memory import ConversationMemory
+from src.pipeline import answer_query, describe_sources
 from src.ingestion.pdf_loader import load_documents
 from src.ingestion.chunker import chunk_documents
 from src.database.vector_store import create_vector_db
-from src.config import DB_DIR
+from src.config import DB_DIR, ADAPTIVE_RETRIEVAL
 
 # --- Page Config ---
 st.set_page_config(
@@ -58,7 +57,7 @@ def initialize_system():
 @st.cache_resource
 def load_retriever():
     """Load the Hybrid Retriever (BM25 + Vector)"""
-    return get_retriever(k=4)
+    return get_retriever(k=4, adaptive=ADAPTIVE_RETRIEVAL)
 
 # --- Sidebar Controls ---
 with st.sidebar:
@@ -72,6 +71,7 @@ with st.sidebar:
     
     if st.button("🧹 Clear Chat History"):
         st.session_state.messages = []
+        st.session_state.pop("memory", None)
         st.rerun()
 
 # --- Main App Logic ---
@@ -86,6 +86,10 @@ if "messages" not in st.session_state:
         "type": "text"
     })
 
+# Token-budgeted conversation memory fed to the Concept Agent (separate from the rendered messages)
+if "memory" not in st.session_state:
+    st.session_state.memory = ConversationMemory()
+
 initialize_system()
 retriever = load_retriever()
 
@@ -110,7 +114,7 @@ for msg in st.session_state.messages:
             if "sources" in msg:
                 with st.expander("📚 View Sources (Attribution)"):
                     for s in msg["sources"]:
-                        st.markdown(f"- **Page {s['page']}** ({s['topic']}): _{s['preview']}..._")
+                        st.markdown(f"- **{s['citation']}** ({s['topic']}): _{s['preview']}..._")
 
 # 3. Handle User Input
 if prompt := st.chat_input("Ask about chemical reactions, equations, or request a quiz..."):
@@ -123,23 +127,16 @@ if prompt := st.chat_input("Ask about chemical reactions, equations, or request
     with st.chat_message("assistant"):
         with st.spinner("🤖 Thinking... (Searching & Routing)"):
             
-            # A. Retrieve Context
-            retrieved_docs = retriever.invoke(prompt)
-            context_text = "\n\n".join([d.page_content for d in retrieved_docs])
+            # A + B. Retrieve Context -> Route Intent -> Generate (shared with the CLI and API server)
+            intent, response, retrieved_docs = answer_query(
+                retriever, prompt, st.session_state.memory.get_history()
+            )
             
             # Prepare Source Metadata for display
-            sources = [{
-                "page": doc.metadata.get("page", "?"),
-                "topic": doc.metadata.get("topic", "General"),
-                "preview": doc.page_content[:100].replace("\n", " ")
-            } for doc in retrieved_docs]
-
-            # B. Route Intent
-            intent = route_query(prompt).strip().upper()
+            sources = describe_sources(retrieved_docs)
             
-            # C. Generate Output
-            if "QUIZ" in intent:
-                response = generate_quiz(prompt, context_text)
+            # C. Render Output
+            if intent == "QUIZ":
                 st.write(f"**📝 Quiz generated based on your request.**")
                 
                 # Render immediately for this turn
@@ -148,6 +145,8 @@ if prompt := st.chat_input("Ask about chemical reactions, equations, or request
                         st.radio("Select an option:", q['options'], key=f"live_q_{idx}")
                         st.caption(f"*(Answer revealed in history)*")
 
+                st.session_state.memory.add_turn(prompt, response)
+
                 # Save to history as 'quiz' type
                 st.session_state.messages.append({
                     "role": "assistant",
@@ -158,17 +157,14 @@ if prompt := st.chat_input("Ask about chemical reactions, equations, or request
                 })
                 
             else: # EXPLAIN or CHAT
-                if "CHAT" in intent:
-                    response = "I am here to help with Science! Try asking: 'Explain displacement reactions'."
-                else:
-                    response = generate_explanation(prompt, context_text, [])
-                
                 st.markdown(response)
                 
                 # Show Sources
                 with st.expander("📚 Sources Used"):
                     for s in sources:
-                        st.markdown(f"- **Page {s['page']}** ({s['topic']})")
+                        st.markdown(f"- **{s['citation']}** ({s['topic']})")
+
+                st.session_state.memory.add_turn(prompt, response)
 
                 # Save to history
                 st.session_state.messages.append({
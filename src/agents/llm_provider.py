@@ -0,0 +1,174 @@
+import re
+import json
+import time
+import random
+import hashlib
+from typing import Any, List, Optional, Iterator
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from src.config import (
+    LLM_PROVIDER, LLM_MODEL_NAME, GROQ_API_KEY,
+    FAKE_LLM_SEED, FAKE_LLM_LATENCY_MS, FAKE_LLM_TOKENS_PER_SECOND,
+    FAKE_LLM_RESPONSE_TOKENS, FAKE_LLM_MALFORMED_JSON_RATE
+)
+
+
+class DeterministicChatModel(BaseChatModel):
+    """
+    Local stand-in for the Groq model, for benchmarks and load tests.
+
+    - Deterministic: the same prompt and seed always give the same answer.
+    - Realistic timing: sleeps `latency_ms` before the first token, then streams
+      at `tokens_per_second`.
+    - Speaks each agent's format: one-word intents for the router, a JSON quiz for
+      the quiz agent (malformed `malformed_json_rate` of the time), prose with a
+      "Source:" line for the concept agent, a short summary for the memory.
+    """
+    seed: int = FAKE_LLM_SEED
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+    tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND
+    response_tokens: int = FAKE_LLM_RESPONSE_TOKENS
+    malformed_json_rate: float = FAKE_LLM_MALFORMED_JSON_RATE
+
+    @property
+    def _llm_type(self) -> str:
+        return "deterministic-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text = self._respond(_prompt_text(messages))
+        tokens = _tokens(text)
+        time.sleep(self.latency_ms / 1000 + len(tokens) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(_prompt_text(messages))
+        time.sleep(self.latency_ms / 1000)
+        for token in _tokens(text):
+            time.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    # --- Canned behaviour per agent (keyed on the prompts in prompts.py) ---
+
+    def _respond(self, prompt):
+        rng = random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}")
+
+        if "intent classifier" in prompt:
+            return _route(_section(prompt, "Query:"))
+        if "Multiple Choice Quiz" in prompt:
+            return self._quiz(_section(prompt, "Context:"), rng)
+        if "running memory" in prompt:
+            turns = _section(prompt, "New Conversation Turns:")
+            return " ".join(_words(turns)[:60])
+        return self._explanation(_section(prompt, "Context:", "Question:"), rng)
+
+    def _quiz(self, context, rng):
+        sentences = _sentences(context) or ["The notes do not cover this topic."]
+        quiz = []
+        for i in range(3):
+            fact = sentences[rng.randrange(len(sentences))]
+            quiz.append({
+                "question": f"Q{i + 1}: Which statement matches the notes? ({fact[:60]})",
+                "options": [f"A. {fact[:40]}", "B. None of these", "C. All of these", "D. Cannot say"],
+                "answer": "A",
+                "explanation": fact,
+            })
+        text = json.dumps(quiz, indent=2)
+
+        if rng.random() < self.malformed_json_rate:
+            return text[: len(text) // 2]  # truncated JSON, like a cut-off generation
+        if rng.random() < 0.3:
+            return f"```json\n{text}\n```"  # markdown fences the quiz agent has to strip
+        return text
+
+    def _explanation(self, context, rng):
+        sources = re.findall(r"Source: ([^\n]+)", context)
+        source = sources[0].strip() if sources else "notes"
+        context = re.sub(r"Source: [^\n]*|Content:", " ", context)
+
+        words = _words(context) or ["This", "topic", "is", "not", "in", "the", "notes."]
+        start = rng.randrange(max(1, len(words) - self.response_tokens))
+        body = words[start:start + self.response_tokens]
+        while len(body) < self.response_tokens:
+            body += words[:self.response_tokens - len(body)]
+        return "**Analogy:** Think of it like a handshake.\n\n" + " ".join(body) + f"\n\nSource: {source}"
+
+
+def _prompt_text(messages):
+    return "\n".join(m.content if isinstance(m.content, str) else str(m.content) for m in messages)
+
+
+def _tokens(text):
+    # Word pieces with their trailing whitespace, so the streamed chunks re-join to the exact text
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def _words(text):
+    return text.split()
+
+
+def _sentences(text):
+    return [s.strip() for s in re.split(r"(?<=[.?!])\s+", text) if len(s.split()) >= 5]
+
+
+def _section(prompt, start_marker, end_marker=None):
+    if start_marker not in prompt:
+        return ""
+    text = prompt.split(start_marker, 1)[1]
+    if end_marker and end_marker in text:
+        text = text.split(end_marker, 1)[0]
+    return text.strip()
+
+
+def _route(query):
+    q = query.lower()
+    if any(word in q for word in ("quiz", "test", "mcq", "practice", "question")):
+        return "QUIZ"
+    if any(re.search(rf"\b{word}\b", q) for word in ("hello", "hi", "thanks", "thank")):
+        return "CHAT"
+    return "EXPLAIN"
+
+
+# --- Provider registry ---
+
+def _groq_provider(temperature):
+    # Imported lazily so the fake provider works without langchain-groq or network access
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=LLM_MODEL_NAME, api_key=GROQ_API_KEY, temperature=temperature)
+
+
+def _fake_provider(temperature):
+    return DeterministicChatModel()
+
+
+_PROVIDERS = {
+    "groq": _groq_provider,
+    "fake": _fake_provider,
+}
+
+
+def register_llm_provider(name, factory):
+    """
+    Adds an LLM backend. `factory(temperature)` must return a LangChain chat model,
+    so it slots into the agents' `prompt | llm | parser` chains unchanged.
+    """
+    _PROVIDERS[name] = factory
+
+
+def get_llm(temperature=0.0, provider=None):
+    """
+    Returns the chat model every agent uses.
+
+    Args:
+        temperature (float): Sampling temperature (ignored by the fake provider).
+        provider (str): Overrides the LLM_PROVIDER setting ("groq", "fake", or a registered name).
+    """
+    name = provider or LLM_PROVIDER
+    if name not in _PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}'. Available: {sorted(_PROVIDERS)}")
+    return _PROVIDERS[name](temperature)
@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tiktoken
+from src.ingestion.chunker import count_tokens
+from src.agents.summary_agent import summarize_conversation
+from src.config import HISTORY_TOKEN_BUDGET, SUMMARY_TOKEN_BUDGET, SUMMARY_MAX_ATTEMPTS
+
+# Summaries are produced off the critical path: the student gets their answer first,
+# and the older turns are compressed while they read it.
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Hard cap on a text's token count (cl100k_base), used to keep summaries in budget."""
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Same fallback as count_tokens: ~1.3 tokens per word
+        words = text.split()
+        max_words = int(max_tokens / 1.3)
+        return text if len(words) <= max_words else " ".join(words[:max_words])
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+class ConversationMemory:
+    """
+    Token-budgeted chat history for the Concept Agent.
+
+    - The most recent turns are kept verbatim while they fit in `token_budget`.
+    - Turns that fall out of the budget are folded into a rolling summary by a
+      background worker, so follow-ups ("when was HE born?") keep their context
+      without the prompt growing with every turn.
+    The newest turn is always kept, even if it alone exceeds the budget.
+    Evicted turns stay in the history verbatim until their summary is ready, up to
+    another `token_budget` tokens (the oldest beyond that are dropped). A batch whose
+    summary fails is retried on the next turn, `SUMMARY_MAX_ATTEMPTS` times in total,
+    then dropped. So the history never exceeds 2 * token_budget + summary_budget,
+    even when the summarizer is down or backed up.
+    """
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET,
+                 summarizer=summarize_conversation):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+
+        self._turns = []          # [(query, response, tokens)] kept verbatim, oldest first
+        self._recent_tokens = 0
+        self._pending = []        # [(query, response, tokens)] evicted, waiting to be summarized
+        self._pending_tokens = 0
+        self._summary = ""
+        self._summary_tokens = 0
+        self._summary_job = None  # Future of the running summarization, if any
+        self._generation = 0      # Bumped by clear() so a late summary can't resurrect old turns
+        self._failures = 0        # Consecutive failed summaries of the oldest pending batch
+        self._lock = threading.Lock()
+
+    def add_turn(self, query, response):
+        """Records a finished turn and schedules summarization of anything that no longer fits."""
+        if isinstance(response, list):
+            # Quiz turns: remember what was asked, not the whole JSON payload
+            response = "Quiz: " + " | ".join(q.get("question", "") for q in response if isinstance(q, dict))
+
+        tokens = count_tokens(f"Student: {query}\nTutor: {response}")
+
+        with self._lock:
+            self._turns.append((query, response, tokens))
+            self._recent_tokens += tokens
+
+            while len(self._turns) > 1 and self._recent_tokens > self.token_budget:
+                old_turn = self._turns.pop(0)
+                self._recent_tokens -= old_turn[2]
+                self._pending.append(old_turn)
+                self._pending_tokens += old_turn[2]
+
+            # Summaries lagging behind: keep only the newest pending turns that fit the budget
+            while len(self._pending) > 1 and self._pending_tokens > self.token_budget:
+                self._pending_tokens -= self._pending.pop(0)[2]
+
+            if self._pending and self._summary_job is None:
+                self._summary_job = _summary_executor.submit(self._summarize_pending)
+
+    def get_history(self):
+        """
+        Returns the history as (role, message) pairs, ready for `generate_explanation`:
+        the rolling summary first (if any), then the recent turns verbatim.
+        Turns still waiting to be summarized are included verbatim, so a follow-up
+        asked while the summary is being written keeps its context.
+        """
+        with self._lock:
+            history = []
+            if self._summary:
+                history.append(("Summary of earlier conversation", self._summary))
+            for query, response, _ in self._pending + self._turns:
+                history.append(("Student", query))
+                history.append(("Tutor", response))
+            return history
+
+    def token_count(self):
+        """Exact number of history tokens currently sent to the LLM."""
+        with self._lock:
+            return self._recent_tokens + self._pending_tokens + self._summary_tokens
+
+    def wait_for_summary(self, timeout=None):
+        """Blocks until background summarization is done. Handy for scripts and benchmarks."""
+        job = self._summary_job
+        if job is not None:
+            job.result(timeout=timeout)
+
+    def clear(self):
+        with self._lock:
+            self._turns = []
+            self._recent_tokens = 0
+            self._pending = []
+            self._pending_tokens = 0
+            self._summary = ""
+            self._summary_tokens = 0
+            self._failures = 0
+            self._generation += 1
+
+    def _summarize_pending(self):
+        # Drains the pending queue; turns evicted while we work are picked up in the next loop.
+        # A batch only leaves the queue once its summary is stored.
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._summary_job = None
+                    return
+                batch = list(self._pending)
+                current_summary = self._summary
+                generation = self._generation
+
+            try:
+                new_summary = self.summarizer(current_summary, [(q, r) for q, r, _ in batch])
+                new_summary = truncate_to_tokens(new_summary, self.summary_budget)
+            except Exception as e:
+                with self._lock:
+                    self._summary_job = None
+                    self._failures += 1
+                    if self._failures < SUMMARY_MAX_ATTEMPTS:
+                        # Keep the turns queued (and verbatim in the history); the next add_turn retries
+                        print(f" Warning: Conversation summary failed ({self._failures}/{SUMMARY_MAX_ATTEMPTS}): {e}")
+                        return
+                    # Give up on this batch: keep the old summary and stop retrying
+                    print(f" Warning: Conversation summary failed {self._failures} times, dropping {len(batch)} turn(s): {e}")
+                    self._failures = 0
+                    if generation == self._generation:
+                        self._remove_pending(batch)
+                return
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._failures = 0
+                self._remove_pending(batch)
+                self._summary = new_summary
+                self._summary_tokens = count_tokens(new_summary)
+
+    def _remove_pending(self, batch):
+        # Caller must hold the lock. Removes by identity: add_turn may have dropped
+        # some of the batch (pending cap) or queued new turns meanwhile.
+        done = {id(turn) for turn in batch}
+        self._pending = [turn for turn in self._pending if id(turn) not in done]
+        self._pending_tokens = sum(turn[2] for turn in self._pending)
@@ -63,4 +63,33 @@ Question:
 
 Chat History:
 {history}
-"""
\ No newline at end of file
+"""
+
+# SUMMARY PROMPT (Rolling memory: compresses older turns so the prompt stays small)
+
+SUMMARY_SYSTEM_PROMPT = """
+You maintain the running memory of a tutoring conversation with a Class 10 student.
+Update the existing summary with the new conversation turns.
+
+CRITICAL INSTRUCTIONS:
+1. Keep every topic, term, person, date and reaction the student asked about, so follow-up questions ("it", "he", "that reaction") can be resolved.
+2. Drop greetings, analogies and formatting. Plain sentences only.
+3. Keep it under {max_tokens} tokens.
+4. Return ONLY the updated summary.
+
+Existing Summary:
+{summary}
+
+New Conversation Turns:
+{turns}
+"""
+
+
+# NOT-IN-NOTES ANSWER (Returned without an LLM call when retrieval finds nothing relevant)
+
+NOT_IN_NOTES_RESPONSE = "I cannot find this specific detail in the notes provided. Try asking about a topic from your chapter."
+
+
+# CHAT ANSWER (Fixed reply when the router classifies a message as small talk)
+
+CHAT_RESPONSE = "Hello! I am your AI Tutor. Ask me anything about your Class 10 chapter."
@@ -1,10 +1,9 @@
 import json
 import re
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
-from src.config import LLM_MODEL_NAME, GROQ_API_KEY
+from src.agents.llm_provider import get_llm
 from src.agents.prompts import QUIZ_SYSTEM_PROMPT
 
 def clean_json_text(text):
@@ -24,11 +23,7 @@ def generate_quiz(query, context):
     Generates a structured JSON quiz.
     Returns a Python List of Dictionaries.
     """
-    llm = ChatGroq(
-        model=LLM_MODEL_NAME,
-        api_key=GROQ_API_KEY,
-        temperature=0.1  # low temp for strict JSON compliance
-    )
+    llm = get_llm(temperature=0.1)  # low temp for strict JSON compliance
 
     # we use JsonOutputParser to enforce structured output
     parser = JsonOutputParser()
@@ -1,19 +1,35 @@
-from langchain_groq import ChatGroq
+import re
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from src.config import LLM_MODEL_NAME, GROQ_API_KEY
+from src.agents.llm_provider import get_llm
 from src.agents.prompts import ROUTER_SYSTEM_PROMPT
 
 def route_query(query):
-    # Use Groq
-    llm = ChatGroq(
-        model=LLM_MODEL_NAME,
-        api_key=GROQ_API_KEY,
-        temperature=0.0
-    )
+    # Use the configured LLM provider (Groq by default)
+    llm = get_llm(temperature=0.0)
     #acts as an orchestrator, helps redirect user's query to "EXPLAIN" or "QUIZ"
     prompt = ChatPromptTemplate.from_template(ROUTER_SYSTEM_PROMPT)
     chain = prompt | llm | StrOutputParser()
     
     intent = chain.invoke({"query": query})
-    return intent.strip().upper()
\ No newline at end of file
+    return intent.strip().upper()
+
+# Greetings/thanks at the start of a short message, e.g. "Hello, thanks for the help!"
+_SMALL_TALK = re.compile(r"^(hi|hii+|hello|hey|thanks|thank you|thank u|good (morning|afternoon|evening)|bye|goodbye)\b", re.IGNORECASE)
+
+def is_small_talk(query):
+    """
+    Cheap, LLM-free CHAT check. Used when retrieval finds nothing and the router is skipped,
+    so a greeting still gets a friendly reply instead of "not in the notes".
+    """
+    return len(query.split()) <= 8 and bool(_SMALL_TALK.match(query.strip()))
+
+# Words that point back at the conversation instead of naming a topic
+_FOLLOW_UP = re.compile(r"\b(it|its|that|this|these|those|them|they|he|she|him|her|again|more|above|previous|same|simpler|elaborate)\b", re.IGNORECASE)
+
+def is_follow_up(query):
+    """
+    Cheap, LLM-free check for follow-ups like "Explain that again with an analogy."
+    Their topic lives in the history, so retrieval on the query alone finds nothing.
+    """
+    return bool(_FOLLOW_UP.search(query))
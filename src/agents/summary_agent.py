@@ -0,0 +1,54 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from src.config import SUMMARY_TOKEN_BUDGET, SUMMARY_CACHE_SIZE
+from src.agents.llm_provider import get_llm
+from src.agents.prompts import SUMMARY_SYSTEM_PROMPT
+
+# Cache of (previous summary, new turns) -> updated summary.
+# Identical conversations (e.g. the same scripted demo, or retries) never pay for the LLM call twice.
+_summary_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(summary, turns_text):
+    return hashlib.sha256(f"{summary}\x00{turns_text}".encode("utf-8")).hexdigest()
+
+
+def summarize_conversation(summary, turns):
+    """
+    Folds older (query, response) turns into the rolling conversation summary.
+
+    Args:
+        summary (str): The current summary ("" if none yet).
+        turns (list): (query, response) pairs that no longer fit in the token budget.
+
+    Returns:
+        str: The updated summary.
+    """
+    turns_text = "\n".join([f"Student: {q}\nTutor: {r}" for q, r in turns])
+    key = _cache_key(summary, turns_text)
+
+    with _cache_lock:
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            return _summary_cache[key]
+
+    llm = get_llm(temperature=0.0)  # deterministic summaries cache better
+    prompt = ChatPromptTemplate.from_template(SUMMARY_SYSTEM_PROMPT)
+    chain = prompt | llm | StrOutputParser()
+
+    new_summary = chain.invoke({
+        "summary": summary or "(none)",
+        "turns": turns_text,
+        "max_tokens": SUMMARY_TOKEN_BUDGET
+    }).strip()
+
+    with _cache_lock:
+        _summary_cache[key] = new_summary
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+    return new_summary
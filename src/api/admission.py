@@ -0,0 +1,70 @@
+import asyncio
+from src.config import MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT_SECONDS
+
+
+class ServerOverloaded(Exception):
+    """Raised when a request is rejected by admission control."""
+
+
+class AdmissionController:
+    """
+    Caps how many requests run the RAG pipeline at once and how many may wait.
+
+    The pipeline is CPU-bound (embeddings, BM25) and rate-limited upstream (Groq),
+    so letting every request in at once only makes all of them slow. Instead:
+      - `max_concurrent` requests run,
+      - up to `max_queued` wait (for at most `queue_timeout` seconds),
+      - everything else is rejected immediately so clients can back off.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_REQUESTS, max_queued=MAX_QUEUED_REQUESTS,
+                 queue_timeout=QUEUE_TIMEOUT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if not self._semaphore.locked():
+            # Fast path: a worker slot is free, no need to queue.
+            await self._semaphore.acquire()
+            return self._admit()
+
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise ServerOverloaded("Too many requests waiting. Please retry shortly.")
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ServerOverloaded("Timed out waiting for a free worker. Please retry shortly.")
+        finally:
+            self.queued -= 1
+
+        return self._admit()
+
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore.release()
+        return False
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+        }
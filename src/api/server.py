@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any
+
+# Add the project root to the system path so we can import 'src'
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(root_dir)
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.database.retriever import get_retriever
+from src.pipeline import ensure_knowledge_base, answer_query, describe_sources
+from src.api.session_store import SessionStore
+from src.api.admission import AdmissionController, ServerOverloaded
+from src.config import SERVER_HOST, SERVER_PORT, ADAPTIVE_RETRIEVAL, MAX_CONCURRENT_REQUESTS
+
+
+class ChatRequest(BaseModel):
+    query: str
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+
+
+class ChatResponse(BaseModel):
+    session_id: str
+    intent: str
+    response: Any  # str for EXPLAIN/CHAT, list of questions for QUIZ
+    sources: list
+    latency_ms: float
+
+
+def run_pipeline(retriever, query, history):
+    """
+    Runs one student turn through the same steps as the CLI (see src/pipeline.py).
+    Blocking; the server calls it from a worker thread.
+    """
+    intent, response, retrieved_docs = answer_query(retriever, query, history)
+    return intent, response, describe_sources(retrieved_docs)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Heavy resources are built ONCE per process and shared by every session:
+    # the Vector DB, the embedding model and the BM25 index inside the retriever.
+    await asyncio.to_thread(ensure_knowledge_base)
+    app.state.retriever = await asyncio.to_thread(get_retriever, k=4, adaptive=ADAPTIVE_RETRIEVAL)
+    app.state.sessions = SessionStore()
+    app.state.admission = AdmissionController()
+    # One thread per admitted request. The default asyncio executor has min(32, cpus + 4)
+    # threads, so on small hosts admitted requests would queue there, unseen by /health.
+    app.state.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="pipeline")
+    yield
+    app.state.executor.shutdown(wait=False)
+
+
+app = FastAPI(title="AI Tutor API", lifespan=lifespan)
+
+
+@app.exception_handler(ServerOverloaded)
+async def overloaded_handler(request, exc):
+    # 503 + Retry-After tells well-behaved clients to back off instead of hammering us.
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "sessions": app.state.sessions.stats(),
+        "admission": app.state.admission.stats(),
+        "retrieval_cache": app.state.retriever.cache.stats() if hasattr(app.state.retriever, "cache") else None,
+    }
+
+
+@app.post("/sessions", response_model=SessionResponse)
+async def create_session():
+    return {"session_id": app.state.sessions.create()}
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    if not app.state.sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return {"deleted": session_id}
+
+
+@app.post("/sessions/{session_id}/chat", response_model=ChatResponse)
+async def chat(session_id: str, body: ChatRequest):
+    query = body.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Query must not be empty.")
+
+    sessions = app.state.sessions
+    history = sessions.get_history(session_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired. Create a new one.")
+
+    start_time = time.perf_counter()
+    async with app.state.admission:
+        intent, response, sources = await asyncio.get_running_loop().run_in_executor(
+            app.state.executor, run_pipeline, app.state.retriever, query, history
+        )
+    latency_ms = (time.perf_counter() - start_time) * 1000
+
+    sessions.append_turn(session_id, query, response)
+
+    return {
+        "session_id": session_id,
+        "intent": intent,
+        "response": response,
+        "sources": sources,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+if __name__ == "__main__":
+    # A single worker process: the whole point is sharing one retriever.
+    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
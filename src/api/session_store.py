@@ -0,0 +1,95 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from src.agents.memory import ConversationMemory
+from src.config import MAX_SESSIONS, SESSION_TTL_SECONDS
+
+
+class SessionStore:
+    """
+    Bounded, thread-safe store of per-student conversation state.
+
+    Each session holds a token-budgeted `ConversationMemory`, the same one the
+    CLI and the Streamlit app use. The store is an LRU: when it is full, the
+    least recently used session is evicted, and idle sessions expire after a TTL.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl_seconds=SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session_id -> {"memory": ConversationMemory, "last_seen": float}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    def create(self):
+        """Creates a new empty session and returns its id."""
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            self._sessions[session_id] = {"memory": ConversationMemory(), "last_seen": time.monotonic()}
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        return session_id
+
+    def get_history(self, session_id):
+        """
+        Returns the session's history as (role, message) pairs, or None if the
+        session does not exist (never created, evicted or expired).
+        """
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                return None
+            memory = session["memory"]
+        return memory.get_history()
+
+    def append_turn(self, session_id, query, response):
+        """Records a turn; the session's memory keeps it within the token budget."""
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                return False
+            memory = session["memory"]
+        memory.add_turn(query, response)
+        return True
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+    # --- Internal helpers (caller must hold the lock) ---
+
+    def _touch(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session["last_seen"] > self.ttl_seconds:
+            del self._sessions[session_id]
+            self.expired += 1
+            return None
+        session["last_seen"] = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _purge_expired(self):
+        # Sessions are ordered by last use, so expired ones sit at the front.
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session["last_seen"] <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
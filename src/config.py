@@ -11,6 +11,19 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 # We use os.path.join to make sure it works on both Windows and Mac
 DATA_DIR = os.path.join("data", "raw")
 DB_DIR = os.path.join("data", "vector_store")
+# Generation stamp of the Vector DB. Rewritten on every rebuild, so caches keyed on it go stale automatically.
+# Kept outside DB_DIR because the rebuild wipes that folder.
+INDEX_VERSION_FILE = os.path.join("data", "index_version.txt")
+
+# --- PDF EXTRACTION ---
+# "pypdf" (default, pure Python) or "pymupdf" (much faster, column-aware; `pip install pymupdf`).
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf")
+# Pages are extracted in parallel worker processes. 1 = extract in-process.
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Extracted text is cached per (file hash, page number), so re-ingestion only parses new/changed PDFs.
+PAGE_CACHE_DIR = os.path.join("data", "cache", "pages")
+# A line seen at the top/bottom of at least this share of pages is a running header/footer and is removed.
+HEADER_FOOTER_MIN_RATIO = 0.5
 
 # --- RAG SETTINGS ---
 # Chunk Size 1000: Good balance. Large enough to capture full context (approx 2-3 paragraphs).
@@ -18,8 +31,85 @@ DB_DIR = os.path.join("data", "vector_store")
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
+# --- NEAR-DUPLICATE REMOVAL ---
+# Chunks whose word 5-gram shingles overlap at least DEDUP_THRESHOLD (Jaccard) are collapsed
+# into one canonical chunk that remembers every source/page it came from.
+# MinHash with DEDUP_NUM_PERM hashes, split into DEDUP_BANDS LSH bands, finds candidates without
+# comparing every pair of chunks.
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.85
+DEDUP_SHINGLE_SIZE = 5
+DEDUP_NUM_PERM = 128
+DEDUP_BANDS = 32
+
+# --- RETRIEVAL CACHE ---
+# In-memory LRU of retrieval results, keyed on (normalized query, k, filters, index version).
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "512"))
+# Optional on-disk tier (SQLite) shared by several workers/processes. Unset = memory only.
+RETRIEVAL_CACHE_DB = os.getenv("RETRIEVAL_CACHE_DB")
+RETRIEVAL_CACHE_DB_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_DB_MAX_ENTRIES", "10000"))
+
+# --- ADAPTIVE RETRIEVAL ---
+# Instead of a fixed k, look at the score distribution of the hybrid candidates:
+# a decisive top hit -> ADAPTIVE_MIN_K chunks, flat scores -> up to k chunks.
+ADAPTIVE_RETRIEVAL = os.getenv("ADAPTIVE_RETRIEVAL", "false").lower() == "true"
+ADAPTIVE_MIN_K = 1
+# Keep candidates whose fused score is at least this fraction of the top score
+ADAPTIVE_RELATIVE_CUTOFF = 0.8
+# If the top fused score beats the runner-up by this much, the top hit alone answers the query
+ADAPTIVE_DECISIVE_GAP = 0.25
+# Early exit ("not in notes", no LLM call) when BOTH signals are weak:
+# dense confidence = 1 / (1 + L2 distance), same normalization as the evaluation script;
+# keyword match = share of the query's best possible BM25 score the notes reach (see _keyword_match
+# in retriever.py): words the notes use everywhere count as matched, words missing from the notes
+# as unmatched. Being a fraction, it doesn't drift with corpus size the way raw BM25 (idf) does.
+# Derived from the golden set in src/evaluate/evaluation.py (`--adaptive` prints the suggestion):
+# on the Class 10 chapter in-scope questions, quiz requests included, match >= 0.30 and
+# off-topic ones <= 0.28; borderline queries are left to the dense confidence.
+ADAPTIVE_MIN_CONFIDENCE = 0.5
+ADAPTIVE_MIN_KEYWORD_MATCH = 0.29
+
 # --- AI MODELS ---
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
 
 # Using Gemini Flash because it is fast, cheap, and has a large context window
-LLM_MODEL_NAME = "llama-3.3-70b-versatile"
\ No newline at end of file
+LLM_MODEL_NAME = "llama-3.3-70b-versatile"
+
+# --- LLM PROVIDER ---
+# "groq" (default) or "fake": a local deterministic stand-in for benchmarks and load tests
+# (no network, no API spend). See src/agents/llm_provider.py.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "42"))
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))             # time to first token
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "250"))  # streaming rate
+FAKE_LLM_RESPONSE_TOKENS = int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "150"))      # length of explanations
+FAKE_LLM_MALFORMED_JSON_RATE = float(os.getenv("FAKE_LLM_MALFORMED_JSON_RATE", "0.1"))
+
+# --- CONVERSATION MEMORY ---
+# Recent turns are kept verbatim up to this many tokens (cl100k_base, same counter as the chunker).
+# Older turns are folded into a rolling summary in the background, capped at SUMMARY_TOKEN_BUDGET.
+# Turns waiting for their summary stay verbatim, capped at another HISTORY_TOKEN_BUDGET tokens.
+# Worst-case history in the prompt is therefore 2 * HISTORY_TOKEN_BUDGET + SUMMARY_TOKEN_BUDGET
+# (plus the newest turn, which is always kept whole).
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "250"))
+# A batch of turns whose summary keeps failing (rate limits, outages) is dropped after this many tries
+SUMMARY_MAX_ATTEMPTS = 3
+SUMMARY_CACHE_SIZE = 256
+
+# --- API SERVER ---
+# One process serves many students: the retriever and embedding model are shared,
+# while each student gets their own conversation state keyed by session id.
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+
+# Session Store: bounded so a flood of new students can't exhaust memory.
+# Least-recently-used sessions are evicted first; idle ones expire after the TTL.
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "1800"))
+
+# Admission Control: at most MAX_CONCURRENT_REQUESTS run the pipeline at once,
+# at most MAX_QUEUED_REQUESTS wait for a slot. Anything beyond that gets a 503.
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "32"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", "10"))
@@ -1,50 +1,379 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Optional
 from langchain_chroma import Chroma
 from langchain_community.retrievers import BM25Retriever
 from langchain_classic.retrievers import EnsembleRetriever
-from src.database.vector_store import get_embedding_function
-from src.config import DB_DIR
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.documents import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from src.database.vector_store import get_embedding_function, get_index_version
+from src.config import (
+    DB_DIR, RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_DB, RETRIEVAL_CACHE_DB_MAX_ENTRIES,
+    ADAPTIVE_MIN_K, ADAPTIVE_RELATIVE_CUTOFF, ADAPTIVE_DECISIVE_GAP, ADAPTIVE_MIN_CONFIDENCE, ADAPTIVE_MIN_KEYWORD_MATCH
+)
 
-def get_retriever(k=3):
+
+def normalize_query(query):
     """
-    Creates a HYBRID retriever that combines Semantic Search (Vector) 
-    with Keyword Search (BM25).
-    
-    Args:
-        k (int): Number of chunks to retrieve (Assignment asks for 3-5).
-        
-    Returns:
-        EnsembleRetriever: A robust retriever combining two strategies.
+    Canonical form of a query for cache lookups:
+    "  What is the pH SCALE?? " and "what is the ph scale" map to the same key.
+    """
+    query = query.lower()
+    query = re.sub(r"[^\w\s]", " ", query)  # punctuation -> space ("chlor-alkali" == "chlor alkali")
+    return " ".join(query.split())
+
+
+def bm25_tokenize(text):
+    """Lowercased, punctuation-free word tokens (the default BM25 tokenizer is a plain str.split)."""
+    return normalize_query(text).split()
+
+
+class RetrievalCache:
+    """
+    Two-tier cache of retrieval results.
+
+    Tier 1: in-process LRU (OrderedDict), bounded by `max_entries`.
+    Tier 2 (optional): a SQLite file shared by several workers, bounded by `disk_max_entries`.
+
+    Keys combine the normalized query, k, filters and the index version, so a
+    rebuilt Vector DB never serves results from the old one.
+    """
+
+    def __init__(self, max_entries=RETRIEVAL_CACHE_SIZE, disk_path=RETRIEVAL_CACHE_DB,
+                 disk_max_entries=RETRIEVAL_CACHE_DB_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS retrieval_cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+                )
+
+    @staticmethod
+    def make_key(query, k, filters, index_version, mode="hybrid", db_dir=DB_DIR):
+        raw = json.dumps(
+            [normalize_query(query), k, filters or {}, index_version, mode, os.path.abspath(db_dir)],
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns a list of Documents, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _to_documents(self._entries[key])
+
+        if self.disk_path:
+            value = self._disk_get(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put_memory(key, value)
+                return _to_documents(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, docs):
+        # Stored as plain (text, metadata) pairs: JSON-safe for the disk tier, and
+        # callers get fresh Document objects on every hit, so they can't corrupt the cache.
+        value = [(d.page_content, d.metadata) for d in docs]
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_path:
+            self._disk_put(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM retrieval_cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_tier": bool(self.disk_path),
+            }
+
+    # --- Internal helpers ---
+
+    def _put_memory(self, key, value):
+        # Caller must hold the lock
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _connect(self):
+        # One short-lived connection per operation: safe across threads and processes.
+        # Use as `with closing(self._connect()) as conn, conn:` (closes, and commits on success).
+        return sqlite3.connect(self.disk_path, timeout=5)
+
+    def _disk_get(self, key):
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT value FROM retrieval_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE retrieval_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f" Warning: Retrieval cache (disk) read failed: {e}")
+            return None
+
+    def _disk_put(self, key, value):
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO retrieval_cache (key, value, accessed) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+                # Evict least recently accessed rows beyond the size limit
+                conn.execute(
+                    "DELETE FROM retrieval_cache WHERE key IN ("
+                    "SELECT key FROM retrieval_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,)
+                )
+        except sqlite3.Error as e:
+            print(f" Warning: Retrieval cache (disk) write failed: {e}")
+
+
+def _to_documents(value):
+    return [Document(page_content=text, metadata=dict(meta)) for text, meta in value]
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    Wraps any retriever with a RetrievalCache. Drop-in replacement: `invoke(query)`
+    behaves exactly like the wrapped retriever, minus the repeated BM25 + vector search.
+
+    `index_version` is the version the wrapped retriever was built from (its BM25 index
+    and Chroma client never change afterwards), so results are always stored under the
+    version of the index that actually produced them. After a rebuild, call
+    get_retriever() again to pick up the new index.
+    """
+    retriever: BaseRetriever
+    cache: Any
+    k: int
+    index_version: str
+    filters: Optional[dict] = None
+    mode: str = "hybrid"  # "hybrid" or "adaptive": they return different results for the same query
+    db_dir: str = DB_DIR  # Vector DB searched; stores must never share each other's results
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun):
+        key = RetrievalCache.make_key(query, self.k, self.filters, self.index_version, self.mode, self.db_dir)
+
+        docs = self.cache.get(key)
+        if docs is not None:
+            return docs
+
+        docs = self.retriever.invoke(query)
+        self.cache.put(key, docs)
+        return docs
+
+
+def _matches_filters(metadata, filters):
+    return all(metadata.get(field) == value for field, value in filters.items())
+
+
+def _chroma_filter(filters):
+    # Chroma needs an explicit $and when filtering on more than one field
+    if len(filters) == 1:
+        return filters
+    return {"$and": [{field: value} for field, value in filters.items()]}
+
+
+def _keyword_match(vectorizer, tokens):
+    """
+    How much of the query the notes cover, from 0 to 1. Each query term can add at most
+    idf * (k1 + 1) (its best possible BM25 score); the match is what the best chunk
+    actually reaches over that maximum.
+      - Terms in most chunks sit on BM25's idf floor. They are either stop-words or the
+        chapter's own topic ("acid" in a chapter on acids), so they count as matched.
+      - Terms missing from the notes are the evidence of an off-topic question; they
+        count at the corpus' highest idf and are never matched.
+    Raw BM25 grows with the corpus (idf), this ratio doesn't, so one threshold works
+    for a chapter or a whole library.
+    """
+    if not tokens or not vectorizer.idf:
+        return 0.0
+
+    idf_floor = getattr(vectorizer, "epsilon", 0.25) * vectorizer.average_idf
+    max_idf = max(vectorizer.idf.values())
+    weight = getattr(vectorizer, "k1", 1.5) + 1
+
+    informative = [t for t in tokens if vectorizer.idf.get(t, 0.0) > idf_floor]
+    common = [t for t in tokens if t in vectorizer.idf and vectorizer.idf[t] <= idf_floor]
+
+    matched = sum(weight * vectorizer.idf[t] for t in common)
+    if informative:
+        matched += float(max(vectorizer.get_scores(informative)))
+    best_possible = sum(weight * vectorizer.idf.get(t, max_idf) for t in tokens)
+    return matched / best_possible
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """
+    Hybrid retriever whose depth follows the score distribution instead of a fixed k.
+
+    For each query it scores BM25 and dense candidates, fuses them
+    (50% BM25 relative to the best keyword match + 50% dense confidence), then:
+      - returns nothing when both the best dense confidence and the keyword match
+        (see _keyword_match) are below their thresholds (callers answer
+        "not in notes" without an LLM call),
+      - returns `min_k` chunks when the top hit is decisive (big gap to the runner-up),
+      - otherwise returns every candidate within ADAPTIVE_RELATIVE_CUTOFF of the top score,
+        capped at `max_k`.
+    Each returned chunk carries 'retrieval_score', 'dense_confidence' and 'bm25_score' metadata.
     """
+    vector_store: Any
+    bm25_retriever: Any = None  # None = dense signal only (e.g. BM25 could not be built)
+    min_k: int = ADAPTIVE_MIN_K
+    max_k: int = 4
+    chroma_filter: Optional[dict] = None
+    early_exit: bool = True  # False = always return chunks (used as a fixed-k baseline in evaluation.py)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun):
+        candidate_count = self.max_k * 2
+        candidates = {}  # page_content -> {"doc", "dense", "bm25"}, merged like EnsembleRetriever does
+
+        # 1. Dense candidates. Chroma returns L2 distance; 1 / (1 + d) maps it to (0, 1]
+        dense_results = self.vector_store.similarity_search_with_score(
+            query, k=candidate_count, filter=self.chroma_filter
+        )
+        for doc, distance in dense_results:
+            candidates[doc.page_content] = {"doc": doc, "dense": 1 / (1 + distance), "bm25": 0.0}
+
+        # 2. BM25 candidates (raw scores over the whole corpus)
+        best_bm25 = 0.0
+        keyword_match = 0.0
+        if self.bm25_retriever is not None:
+            vectorizer = self.bm25_retriever.vectorizer
+            tokens = self.bm25_retriever.preprocess_func(query)
+            scores = vectorizer.get_scores(tokens)
+            ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:candidate_count]
+            best_bm25 = float(scores[ranked[0]]) if ranked else 0.0
+            for i in ranked:
+                doc = self.bm25_retriever.docs[i]
+                entry = candidates.setdefault(doc.page_content, {"doc": doc, "dense": 0.0, "bm25": 0.0})
+                entry["bm25"] = float(scores[i])
+
+            keyword_match = _keyword_match(vectorizer, tokens)
+
+        best_dense = max((c["dense"] for c in candidates.values()), default=0.0)
+
+        # 3. Early exit: nothing in the notes is close enough to be worth an LLM call
+        if self.early_exit and best_dense < ADAPTIVE_MIN_CONFIDENCE and keyword_match < ADAPTIVE_MIN_KEYWORD_MATCH:
+            return []
+
+        # 4. Fuse and rank
+        for entry in candidates.values():
+            bm25_relative = entry["bm25"] / best_bm25 if best_bm25 > 0 else 0.0
+            entry["fused"] = 0.5 * bm25_relative + 0.5 * entry["dense"]
+        ranked = sorted(candidates.values(), key=lambda c: c["fused"], reverse=True)
+
+        # 5. Pick k from the score distribution
+        top = ranked[0]["fused"]
+        if len(ranked) > 1 and top - ranked[1]["fused"] >= ADAPTIVE_DECISIVE_GAP:
+            k = self.min_k
+        else:
+            k = sum(1 for c in ranked if c["fused"] >= top * ADAPTIVE_RELATIVE_CUTOFF)
+        k = max(self.min_k, min(self.max_k, k))
+
+        results = []
+        for entry in ranked[:k]:
+            meta = dict(entry["doc"].metadata)
+            meta["retrieval_score"] = round(entry["fused"], 4)
+            meta["dense_confidence"] = round(entry["dense"], 4)
+            meta["bm25_score"] = round(entry["bm25"], 4)
+            results.append(Document(page_content=entry["doc"].page_content, metadata=meta))
+        return results
+
+
+def _build_retriever(k, filters, adaptive=False, db_dir=DB_DIR):
     embedding_fn = get_embedding_function()
-    
+
     # 1. Initialize Vector Store (Semantic Search)
     vector_store = Chroma(
-        persist_directory=DB_DIR,
+        persist_directory=db_dir,
         embedding_function=embedding_fn
     )
-    
+
+    search_kwargs = {"k": k}
+    if filters:
+        search_kwargs["filter"] = _chroma_filter(filters)
+
     # Reconstruction for Hybrid Search
     # To use BM25 (Keyword Search), we need the raw text of the chunks.
     # Instead of re-reading PDFs, we pull the text directly from our Vector DB.
     try:
         # Fetch all stored documents from Chroma
-        data = vector_store.get() 
+        data = vector_store.get()
         texts = data['documents']
         metadatas = data['metadatas']
-        
+
+        if filters:
+            pairs = [(t, m) for t, m in zip(texts, metadatas) if _matches_filters(m or {}, filters)]
+            texts = [t for t, _ in pairs]
+            metadatas = [m for _, m in pairs]
+
         if not texts:
             print(" Warning: Vector DB is empty. utilizing fallback.")
-            return vector_store.as_retriever(search_kwargs={"k": k})
+            if adaptive:
+                return AdaptiveRetriever(vector_store=vector_store, max_k=k, chroma_filter=search_kwargs.get("filter"))
+            return vector_store.as_retriever(search_kwargs=search_kwargs)
 
         # 2. Initialize BM25 Retriever (Keyword Search)
         # This catches specific terms like "Fe2O3" or "displacement" that vectors might miss.
-        bm25_retriever = BM25Retriever.from_texts(texts, metadatas=metadatas)
+        if adaptive:
+            # Adaptive mode reads absolute BM25 scores, so "Chlor-alkali process." must match
+            # "chlor alkali process": index with the same normalization as the cache keys.
+            bm25_retriever = BM25Retriever.from_texts(texts, metadatas=metadatas, preprocess_func=bm25_tokenize)
+        else:
+            bm25_retriever = BM25Retriever.from_texts(texts, metadatas=metadatas)
         bm25_retriever.k = k
 
+        if adaptive:
+            print(f"Adaptive Hybrid Retriever initialized (BM25 + Chroma) with k={ADAPTIVE_MIN_K}..{k}")
+            return AdaptiveRetriever(
+                vector_store=vector_store,
+                bm25_retriever=bm25_retriever,
+                max_k=k,
+                chroma_filter=search_kwargs.get("filter")
+            )
+
         # 3. Initialize Standard Vector Retriever
         chroma_retriever = vector_store.as_retriever(
             search_type="similarity",
-            search_kwargs={"k": k}
+            search_kwargs=search_kwargs
         )
 
         # 4. Create Ensemble (Hybrid) Retriever
@@ -53,11 +382,53 @@ def get_retriever(k=3):
             retrievers=[bm25_retriever, chroma_retriever],
             weights=[0.5, 0.5]
         )
-        
+
         print(f"Hybrid Retriever initialized (BM25 + Chroma) with k={k}")
         return ensemble_retriever
 
     except Exception as e:
         print(f" Error initializing Hybrid Search: {e}")
         print("Falling back to standard Vector Search.")
-        return vector_store.as_retriever(search_kwargs={"k": k})
\ No newline at end of file
+        if adaptive:
+            return AdaptiveRetriever(vector_store=vector_store, max_k=k, chroma_filter=search_kwargs.get("filter"))
+        return vector_store.as_retriever(search_kwargs=search_kwargs)
+
+
+def get_retriever(k=3, filters=None, use_cache=True, cache=None, adaptive=False, db_dir=DB_DIR):
+    """
+    Creates a HYBRID retriever that combines Semantic Search (Vector)
+    with Keyword Search (BM25).
+
+    Args:
+        k (int): Number of chunks to retrieve (Assignment asks for 3-5). The upper bound in adaptive mode.
+        filters (dict): Optional exact-match metadata filters, e.g. {"source": "data/raw/chap2.pdf"}.
+        use_cache (bool): Wrap the retriever in a RetrievalCache (see CachedRetriever).
+        cache (RetrievalCache): Cache to use; a new one built from config if None. Stores other
+                                than DB_DIR get an in-memory cache only: the index version (and so
+                                the shared SQLite tier) only tracks the main knowledge base.
+        adaptive (bool): Choose k per query from the score distribution (see AdaptiveRetriever).
+                         May return NO documents when nothing in the notes matches.
+        db_dir (str): Vector DB to search. Defaults to the main knowledge base.
+
+    Returns:
+        BaseRetriever: The hybrid retriever, wrapped in a CachedRetriever if use_cache is True.
+    """
+    # Read the version BEFORE building: if the index is rebuilt meanwhile, results are
+    # filed under the older version, never stale results under the newer one.
+    index_version = get_index_version()
+    retriever = _build_retriever(k, filters, adaptive, db_dir)
+    if not use_cache:
+        return retriever
+
+    if cache is None:
+        cache = RetrievalCache(disk_path=RETRIEVAL_CACHE_DB if db_dir == DB_DIR else None)
+
+    return CachedRetriever(
+        retriever=retriever,
+        cache=cache,
+        k=k,
+        index_version=index_version,
+        db_dir=db_dir,
+        filters=filters,
+        mode="adaptive" if adaptive else "hybrid"
+    )
@@ -1,9 +1,10 @@
 import os
+import time
 import shutil
 from langchain_chroma import Chroma
 # Using Local Embeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from src.config import DB_DIR
+from src.config import DB_DIR, INDEX_VERSION_FILE
 
 def get_embedding_function():
     # Using Local MPNet (512 tokens) as discussed
@@ -12,15 +13,38 @@ def get_embedding_function():
         model_kwargs={'device': 'cpu'}
     )
 
-def create_vector_db(chunks):
+def get_index_version():
+    """
+    Returns the generation stamp of the current Vector DB ("0" if it was never stamped).
+    Caches include it in their keys so results from an older index are never served.
+    """
+    try:
+        with open(INDEX_VERSION_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+def bump_index_version():
+    """Stamps the Vector DB with a new generation. Call after every rebuild or update."""
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(INDEX_VERSION_FILE) or ".", exist_ok=True)
+    with open(INDEX_VERSION_FILE, "w", encoding="utf-8") as f:
+        f.write(version)
+    return version
+
+def create_vector_db(chunks, db_dir=DB_DIR):
     if not chunks: return
-    if os.path.exists(DB_DIR): shutil.rmtree(DB_DIR)
+    if os.path.exists(db_dir): shutil.rmtree(db_dir)
     
     embedding_fn = get_embedding_function()
-    vector_store = Chroma.from_documents(chunks, embedding_fn, persist_directory=DB_DIR)
+    vector_store = Chroma.from_documents(chunks, embedding_fn, persist_directory=db_dir)
+    # The version stamp (and the caches keyed on it) belongs to the main knowledge base only;
+    # scratch indexes such as the benchmark corpora don't invalidate it.
+    if db_dir == DB_DIR:
+        bump_index_version()
     return vector_store
 
-def load_vector_db():
-    if not os.path.exists(DB_DIR): raise FileNotFoundError(f"No DB at {DB_DIR}")
+def load_vector_db(db_dir=DB_DIR):
+    if not os.path.exists(db_dir): raise FileNotFoundError(f"No DB at {db_dir}")
     embedding_fn = get_embedding_function()
-    return Chroma(persist_directory=DB_DIR, embedding_function=embedding_fn)
\ No newline at end of file
+    return Chroma(persist_directory=db_dir, embedding_function=embedding_fn)
\ No newline at end of file
@@ -0,0 +1,316 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+# Benchmarks run against the local deterministic LLM unless told otherwise,
+# so they need no network access or API key. Must be set before 'src' is imported.
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+# 1. Add the project root to the system path so we can import 'src'
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(root_dir)
+
+try:
+    import resource  # Unix only; peak RSS is skipped elsewhere
+except ImportError:
+    resource = None
+
+from langchain_core.documents import Document
+from src.ingestion.pdf_loader import load_documents
+from src.ingestion.chunker import chunk_documents
+from src.database.vector_store import create_vector_db
+from src.database.retriever import get_retriever
+from src.agents.memory import ConversationMemory
+from src.pipeline import answer_query
+from src.evaluate.load_test import percentile
+from src.config import (
+    LLM_PROVIDER, ADAPTIVE_RETRIEVAL,
+    FAKE_LLM_SEED, FAKE_LLM_LATENCY_MS, FAKE_LLM_TOKENS_PER_SECOND,
+    FAKE_LLM_RESPONSE_TOKENS, FAKE_LLM_MALFORMED_JSON_RATE
+)
+
+BASELINE_FILE = os.path.join(current_dir, "benchmark_baseline.json")
+
+# Explanations, a follow-up, a quiz, small talk and an off-topic question: every branch of the pipeline.
+BENCHMARK_QUERIES = [
+    "What is the pH scale?",
+    "Why does distilled water not conduct electricity?",
+    "Explain that again with an analogy.",
+    "Describe the Chlor-alkali process.",
+    "Give me a quiz on acids and bases",
+    "What happens when an acid reacts with a metal carbonate?",
+    "Hello, thanks for the help!",
+    "Who won the cricket world cup?",
+]
+
+QUERY_STAGES = ("retrieve", "route", "generate", "total")
+
+
+def replicate_corpus(documents, copies):
+    """
+    Builds a corpus `copies` times the size of the real one. Each copy gets its own
+    source name, so the retrievers see distinct documents (like more textbooks).
+    """
+    corpus = []
+    for i in range(copies):
+        for doc in documents:
+            meta = doc.metadata.copy()
+            meta["source"] = f"copy{i}/{meta.get('source', 'Unknown')}"
+            corpus.append(Document(page_content=doc.page_content, metadata=meta))
+    return corpus
+
+
+def timed_turn(retriever, query, memory, timings):
+    """
+    One student turn through the shared pipeline (src/pipeline.py), as main.py runs it.
+    Appends the seconds spent in each stage, and in total, to `timings[stage]`.
+    """
+    start_time = time.perf_counter()
+    _, response, _ = answer_query(retriever, query, memory.get_history(), timings=timings)
+    memory.add_turn(query, response)
+    timings["total"].append(time.perf_counter() - start_time)
+
+
+def run_students(retriever, queries, concurrency):
+    """
+    Runs `concurrency` simulated students in parallel, each asking every query
+    once with their own memory. Returns (stage timings, wall time in seconds).
+    """
+    timings = {stage: [] for stage in QUERY_STAGES}
+    lock = threading.Lock()
+
+    def student():
+        memory = ConversationMemory()
+        local = {stage: [] for stage in QUERY_STAGES}
+        for query in queries:
+            timed_turn(retriever, query, memory, local)
+        memory.wait_for_summary()
+        with lock:
+            for stage in QUERY_STAGES:
+                timings[stage].extend(local[stage])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(student) for _ in range(concurrency)]:
+            future.result()
+    return timings, time.perf_counter() - start
+
+
+def _summarize(values):
+    return {
+        "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+    }
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_memory(documents, copies, queries, db_dir):
+    """
+    Peak Python heap (MB) of chunking the corpus, loading the retriever over the
+    already-built index and one student's queries. A separate pass because tracemalloc
+    slows every allocation and would inflate the timed stages.
+    """
+    tracemalloc.start()
+    try:
+        chunk_documents(replicate_corpus(documents, copies), dedup=False)
+        retriever = get_retriever(k=4, use_cache=False, adaptive=ADAPTIVE_RETRIEVAL, db_dir=db_dir)
+        run_students(retriever, queries, 1)
+        _, peak_heap = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_heap / (1024 * 1024)
+
+
+def benchmark_corpus(documents, copies, queries, concurrency, work_dir):
+    """
+    Ingests a `copies`x corpus into a scratch vector DB and runs the query workload on it.
+    Timed without memory tracing; memory is measured afterwards (see measure_memory).
+
+    Returns:
+        dict: Per-stage latency stats (ms), throughput (queries/s) and memory (MB).
+    """
+    db_dir = os.path.join(work_dir, f"vector_store_{copies}x")
+
+    start = time.perf_counter()
+    corpus = replicate_corpus(documents, copies)
+    chunks = chunk_documents(corpus, dedup=False)  # Dedup would fold the copies back into one
+    chunk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    create_vector_db(chunks, db_dir=db_dir)
+    retriever = get_retriever(k=4, use_cache=False, adaptive=ADAPTIVE_RETRIEVAL, db_dir=db_dir)
+    index_time = time.perf_counter() - start
+
+    timings, wall_time = run_students(retriever, queries, concurrency)
+    peak_rss = _peak_rss_mb()  # Read before the memory pass, so it reflects the timed run
+
+    peak_heap = measure_memory(documents, copies, queries, db_dir)
+
+    return {
+        "pages": len(corpus),
+        "chunks": len(chunks),
+        "ingest_ms": {"chunk": chunk_time * 1000, "index": index_time * 1000},
+        "query": {stage: _summarize(timings[stage]) for stage in QUERY_STAGES},
+        "throughput_qps": len(timings["total"]) / wall_time if wall_time else 0.0,
+        "peak_heap_mb": peak_heap,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def _fake_llm_settings():
+    return {
+        "provider": LLM_PROVIDER,
+        "seed": FAKE_LLM_SEED,
+        "latency_ms": FAKE_LLM_LATENCY_MS,
+        "tokens_per_second": FAKE_LLM_TOKENS_PER_SECOND,
+        "response_tokens": FAKE_LLM_RESPONSE_TOKENS,
+        "malformed_json_rate": FAKE_LLM_MALFORMED_JSON_RATE,
+    }
+
+
+def _metrics(result):
+    """
+    Flattens one corpus result into {metric: (value, higher_is_better)} for the regression check.
+    """
+    metrics = {f"ingest.{stage}_ms": (value, False) for stage, value in result["ingest_ms"].items()}
+    for stage, stats in result["query"].items():
+        metrics[f"query.{stage}.p50_ms"] = (stats["p50_ms"], False)
+        metrics[f"query.{stage}.p95_ms"] = (stats["p95_ms"], False)
+    metrics["throughput_qps"] = (result["throughput_qps"], True)
+    metrics["peak_heap_mb"] = (result["peak_heap_mb"], False)
+    return metrics
+
+
+def find_regressions(report, baseline, tolerance):
+    """
+    Compares a report to the stored baseline.
+
+    A metric regresses when it is more than `tolerance` (e.g. 0.2 = 20%) worse than
+    its baseline value: slower / more memory, or lower throughput.
+
+    Returns:
+        list: Human-readable descriptions of every regression.
+    """
+    regressions = []
+    for stage, value in report["load_ms"].items():
+        base = baseline.get("load_ms", {}).get(stage, 0)
+        if base > 0 and (value - base) / base > tolerance:
+            regressions.append(f"load.{stage}_ms: {value:.1f} vs baseline {base:.1f} ({(value - base) / base:+.0%})")
+
+    for corpus, result in report["corpora"].items():
+        if corpus not in baseline.get("corpora", {}):
+            print(f"⚠️ No baseline for corpus {corpus}; skipping comparison.")
+            continue
+
+        expected = _metrics(baseline["corpora"][corpus])
+        for name, (value, higher_is_better) in _metrics(result).items():
+            if name not in expected or expected[name][0] <= 0:
+                continue
+            base = expected[name][0]
+            change = (value - base) / base
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{corpus} {name}: {value:.1f} vs baseline {base:.1f} ({change:+.0%})")
+    return regressions
+
+
+def print_report(report):
+    print("\n📊 END-TO-END BENCHMARK RESULTS")
+    print("=" * 78)
+    load = report["load_ms"]
+    print(f"Load PDFs: cold {load['cold']:.0f} ms (empty page cache) | warm {load['warm']:.0f} ms (cached pages)")
+    for corpus, result in report["corpora"].items():
+        print(f"\nCorpus {corpus}: {result['pages']} pages -> {result['chunks']} chunks")
+        print(f"   Ingest:   chunk {result['ingest_ms']['chunk']:.0f} ms | index {result['ingest_ms']['index']:.0f} ms")
+        print(f"   {'STAGE':<10} | {'MEAN (ms)':>10} | {'P50 (ms)':>10} | {'P95 (ms)':>10}")
+        for stage, stats in result["query"].items():
+            print(f"   {stage:<10} | {stats['mean_ms']:>10.0f} | {stats['p50_ms']:>10.0f} | {stats['p95_ms']:>10.0f}")
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"   Throughput: {result['throughput_qps']:.2f} queries/s | "
+              f"Peak Python heap: {result['peak_heap_mb']:.1f} MB | Peak RSS: {rss}")
+    print("\n" + "=" * 78)
+
+
+def run_benchmark(sizes, concurrency, repeat):
+    print(f"🧪 End-to-End Benchmark: corpus sizes {sizes}, {concurrency} concurrent student(s), "
+          f"LLM provider '{LLM_PROVIDER}'\n")
+
+    queries = BENCHMARK_QUERIES * repeat
+    report = {"llm": _fake_llm_settings(), "concurrency": concurrency, "repeat": repeat,
+              "load_ms": {}, "corpora": {}}
+
+    work_dir = tempfile.mkdtemp(prefix="tutor_benchmark_")
+    try:
+        # PDF loading against a fresh page cache: the first pass parses every page (cold),
+        # the second reads them back from the cache (warm). Never touches data/cache/pages.
+        page_cache = os.path.join(work_dir, "pages")
+        for phase in ("cold", "warm"):
+            start = time.perf_counter()
+            documents = load_documents(cache_dir=page_cache)
+            report["load_ms"][phase] = (time.perf_counter() - start) * 1000
+            if not documents:
+                print("❌ Error: No PDFs found in data/raw/. Please add a file.")
+                sys.exit(1)
+
+        for copies in sizes:
+            print(f"\n--- Corpus {copies}x ---")
+            report["corpora"][f"{copies}x"] = benchmark_corpus(documents, copies, queries, concurrency, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end latency/throughput/memory benchmark of the tutor pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="Corpus sizes, as copies of data/raw")
+    parser.add_argument("--concurrency", type=int, default=1, help="Simulated students asking in parallel")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each student runs the query set")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sizes, args.concurrency, args.repeat)
+    print_report(report)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}. Run with --update-baseline to create one.")
+        sys.exit(0)
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    for key in ("llm", "concurrency", "repeat"):
+        if baseline.get(key) != report[key]:
+            print(f"⚠️ Baseline was recorded with a different '{key}' ({baseline.get(key)}); numbers may not be comparable.")
+
+    regressions = find_regressions(report, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"   - {line}")
+        sys.exit(1)
+
+    print(f"✅ No regressions beyond {args.tolerance:.0%} of the baseline.")
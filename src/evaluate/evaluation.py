@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+import argparse
 
 # 1. Add the project root to the system path so we can import 'src'
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,6 +9,9 @@ root_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(root_dir)
 
 from src.database.vector_store import load_vector_db
+from src.database.retriever import get_retriever, AdaptiveRetriever, bm25_tokenize, _keyword_match
+from src.ingestion.chunker import count_tokens
+from src.pipeline import format_docs_for_agent
 
 def evaluate_retrieval(test_queries):
     """
@@ -81,6 +85,118 @@ def evaluate_retrieval(test_queries):
     else:
         print("⚠️ RATING: POOR (Check chunk size or embeddings)")
 
+def _context_tokens(docs):
+    # Exactly the context the agents receive
+    return count_tokens(format_docs_for_agent(docs))
+
+def _is_hit(docs, expected):
+    """
+    Recall check: did we retrieve a chunk containing the expected phrase?
+    For out-of-scope queries (expected=None), retrieving nothing is the correct answer.
+    """
+    if expected is None:
+        return not docs
+    return any(expected.lower() in d.page_content.lower() for d in docs)
+
+def suggest_keyword_threshold(adaptive, golden_queries):
+    """
+    Keyword match (see _keyword_match in retriever.py) of every golden query, and the
+    ADAPTIVE_MIN_KEYWORD_MATCH that separates in-scope from out-of-scope ones.
+    """
+    if adaptive.bm25_retriever is None:
+        print("⚠️ No BM25 index; cannot derive the keyword threshold.")
+        return
+
+    vectorizer = adaptive.bm25_retriever.vectorizer
+    scores = [(query, expected, _keyword_match(vectorizer, bm25_tokenize(query))) for query, expected in golden_queries]
+    in_scope = [score for _, expected, score in scores if expected is not None]
+    out_of_scope = [score for _, expected, score in scores if expected is None]
+
+    print(f"\n{'QUERY':<55} | {'SCOPE':<6} | {'KEYWORD MATCH':<13}")
+    print("-" * 80)
+    for query, expected, score in scores:
+        print(f"{query[:52]:<55} | {'in' if expected is not None else 'out':<6} | {score:.3f}")
+    print("-" * 80)
+    if in_scope and out_of_scope:
+        print(f"In-scope min: {min(in_scope):.3f} | Out-of-scope max: {max(out_of_scope):.3f} | "
+              f"Suggested ADAPTIVE_MIN_KEYWORD_MATCH: {(min(in_scope) + max(out_of_scope)) / 2:.2f}")
+
+def evaluate_adaptive(golden_queries, k=4):
+    """
+    Compares three ways of filling the LLM context on:
+    1. Chunks and context tokens sent to the LLM (prompt size)
+    2. Retrieval latency
+    3. Recall (expected phrase present in the retrieved chunks)
+    4. LLM calls skipped by the "not in notes" early exit
+
+    - ENSEMBLE: the default hybrid retriever; the union of BM25 top-k and dense top-k (up to 2k chunks).
+    - TOP-K: the top k of the same fused BM25 + dense ranking the adaptive retriever uses.
+    - ADAPTIVE: 1..k chunks from the score distribution, or none.
+    ENSEMBLE -> TOP-K is the saving from the k cap alone; TOP-K -> ADAPTIVE is the gain from adapting.
+    """
+    print(f"🧪 Starting Adaptive Retrieval Evaluation (ensemble k={k} vs fused top-{k} vs adaptive 1..{k})...\n")
+
+    try:
+        ensemble = get_retriever(k=k, use_cache=False)
+        adaptive = get_retriever(k=k, use_cache=False, adaptive=True)
+    except Exception as e:
+        print(f"❌ Error: Could not load database. Run main.py first. Details: {e}")
+        return
+
+    if not isinstance(adaptive, AdaptiveRetriever):
+        print("❌ Error: Adaptive retriever could not be built.")
+        return
+    top_k = adaptive.model_copy(update={"min_k": k, "early_exit": False})
+
+    names = ("ensemble", "top-k", "adaptive")
+    retrievers = dict(zip(names, (ensemble, top_k, adaptive)))
+    totals = {name: {"chunks": 0, "tokens": 0, "time": 0.0, "hits": 0} for name in names}
+    skipped_llm_calls = 0
+
+    print(f"{'QUERY':<40} | {'ENSEMBLE (ch/tok)':<17} | {'TOP-K (ch/tok)':<14} | {'ADAPTIVE (ch/tok)':<17} | {'RECALL E/T/A':<12}")
+    print("-" * 112)
+
+    for query, expected in golden_queries:
+        row = {}
+        for name, retriever in retrievers.items():
+            start_time = time.time()
+            docs = retriever.invoke(query)
+            latency = time.time() - start_time
+
+            tokens = _context_tokens(docs)
+            hit = _is_hit(docs, expected)
+            totals[name]["chunks"] += len(docs)
+            totals[name]["tokens"] += tokens
+            totals[name]["time"] += latency
+            totals[name]["hits"] += int(hit)
+            row[name] = (len(docs), tokens, hit)
+
+        if row["adaptive"][0] == 0:
+            skipped_llm_calls += 1
+
+        e, t, a = row["ensemble"], row["top-k"], row["adaptive"]
+        print(f"{query[:37]:<40} | {f'{e[0]} / {e[1]}':<17} | {f'{t[0]} / {t[1]}':<14} | {f'{a[0]} / {a[1]}':<17} | "
+              f"{' / '.join('✓' if r[2] else '✗' for r in (e, t, a))}")
+
+    n = len(golden_queries)
+
+    def saving(before, after):
+        return 1 - totals[after]["tokens"] / totals[before]["tokens"] if totals[before]["tokens"] else 0.0
+
+    print("-" * 112)
+    print("\n📊 ADAPTIVE RETRIEVAL METRICS")
+    print("=" * 50)
+    for name in names:
+        t = totals[name]
+        print(f"{name.upper():<9} avg chunks: {t['chunks'] / n:.2f} | avg context tokens: {t['tokens'] / n:.0f} | "
+              f"avg latency: {t['time'] / n:.4f}s | recall: {t['hits']}/{n}")
+    print(f"✂️  Tokens saved by the k cap (ensemble -> top-{k}): {saving('ensemble', 'top-k'):.1%}")
+    print(f"✂️  Tokens saved by adapting (top-{k} -> adaptive): {saving('top-k', 'adaptive'):.1%}")
+    print(f"⚡ LLM calls skipped:       {skipped_llm_calls}/{n} (answered 'not in notes' directly)")
+    print("=" * 50)
+
+    suggest_keyword_threshold(adaptive, golden_queries)
+
 if __name__ == "__main__":
     # Test Queries tailored to your specific content
     sample_queries = [
@@ -92,4 +208,33 @@ if __name__ == "__main__":
         "What did the reaction of metal carbonates with acids produce?"
     ]
     
-    evaluate_retrieval(sample_queries)
\ No newline at end of file
+    # Golden set for adaptive retrieval: (query, phrase the right chunk must contain).
+    # None = out-of-scope question; the correct behaviour is to retrieve nothing.
+    golden_queries = [
+        ("What is the meaning of water of crystallisation?", "water of crystallisation"),
+        ("Why does distilled water not conduct electricity?", "distilled water"),
+        ("Describe the Chlor-alkali process.", "chlor-alkali"),
+        ("What is the pH scale?", "pH scale"),
+        ("What is Plaster of Paris used for?", "Plaster of Paris"),
+        ("How does tooth decay start?", "tooth decay"),
+        ("What did the reaction of metal carbonates with acids produce?", "carbonate"),
+        ("What is an acid?", "acid"),
+        ("Tell me about bases", "base"),
+        ("What is baking soda?", "baking soda"),
+        ("Give me a quiz on acids and bases", "acid"),
+        ("Quiz me on the pH scale", "pH scale"),
+        ("Who won the cricket world cup in 2011?", None),
+        ("What is the capital of France?", None),
+        ("How do black holes form?", None),
+        ("Give me a quiz on the French Revolution", None),
+        ("What is Newton's second law?", None),
+    ]
+
+    parser = argparse.ArgumentParser(description="Retrieval evaluation")
+    parser.add_argument("--adaptive", action="store_true", help="Compare fixed-k vs adaptive retrieval")
+    args = parser.parse_args()
+
+    if args.adaptive:
+        evaluate_adaptive(golden_queries)
+    else:
+        evaluate_retrieval(sample_queries)
@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+# 1. Add the project root to the system path so we can import 'src'
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(root_dir)
+
+from src.config import SERVER_HOST, SERVER_PORT
+
+# A typical student session: a few questions, a follow-up, and a quiz request.
+STUDENT_SCRIPT = [
+    "What is the pH scale?",
+    "Why does distilled water not conduct electricity?",
+    "Explain that again with an analogy.",
+    "Describe the Chlor-alkali process.",
+    "Give me a quiz on acids and bases",
+]
+
+
+def _post(url, payload=None, timeout=120):
+    data = json.dumps(payload or {}).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, json.loads(response.read().decode("utf-8"))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile. Returns 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def simulate_student(base_url, turns, think_time, results, lock):
+    """
+    One simulated student: opens a session and asks `turns` questions,
+    pausing `think_time` seconds (+/- jitter) between them.
+    Records (status, latency_seconds) for every chat request.
+    """
+    try:
+        _, body = _post(f"{base_url}/sessions")
+        session_id = body["session_id"]
+    except Exception as e:
+        with lock:
+            results.append(("error", 0.0))
+        print(f"❌ Could not create session: {e}")
+        return
+
+    for i in range(turns):
+        query = STUDENT_SCRIPT[i % len(STUDENT_SCRIPT)]
+        start_time = time.perf_counter()
+        try:
+            status, _ = _post(f"{base_url}/sessions/{session_id}/chat", {"query": query})
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = "error"
+        latency = time.perf_counter() - start_time
+
+        with lock:
+            results.append((status, latency))
+
+        # No pause after the last question: it would only pad the measured wall time
+        if think_time > 0 and i < turns - 1:
+            time.sleep(think_time * random.uniform(0.5, 1.5))
+
+
+def run_load_test(base_url, students, turns, think_time):
+    print(f"🧪 Load Test: {students} students x {turns} turns against {base_url}\n")
+
+    results = []
+    lock = threading.Lock()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=students) as pool:
+        for _ in range(students):
+            pool.submit(simulate_student, base_url, turns, think_time, results, lock)
+    wall_time = time.perf_counter() - start_time
+
+    ok = [lat for status, lat in results if status == 200]
+    rejected = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(ok) - rejected
+
+    print("📊 LOAD TEST RESULTS")
+    print("=" * 40)
+    print(f"Requests sent:        {len(results)}")
+    print(f"Succeeded (200):      {len(ok)}")
+    print(f"Rejected (503):       {rejected}")
+    print(f"Failed (other):       {failed}")
+    print(f"Wall time:            {wall_time:.2f} s")
+    print(f"Throughput:           {len(ok) / wall_time:.2f} req/s" if wall_time else "Throughput: n/a")
+    print(f"Latency p50:          {percentile(ok, 50) * 1000:.0f} ms")
+    print(f"Latency p95:          {percentile(ok, 95) * 1000:.0f} ms")
+    print(f"Latency p99:          {percentile(ok, 99) * 1000:.0f} ms")
+    print(f"Latency max:          {max(ok) * 1000 if ok else 0:.0f} ms")
+    print("=" * 40)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the AI Tutor API with concurrent simulated students.")
+    parser.add_argument("--url", default=f"http://{SERVER_HOST}:{SERVER_PORT}", help="Base URL of the API server")
+    parser.add_argument("--students", type=int, default=20, help="Number of concurrent students")
+    parser.add_argument("--turns", type=int, default=5, help="Questions asked per student")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Average pause between questions (seconds)")
+    args = parser.parse_args()
+
+    run_load_test(args.url.rstrip("/"), args.students, args.turns, args.think_time)
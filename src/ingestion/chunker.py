@@ -1,7 +1,8 @@
 import tiktoken
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from src.config import CHUNK_SIZE, CHUNK_OVERLAP
+from src.ingestion.dedup import deduplicate_chunks
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP, DEDUP_ENABLED
 
 
 def count_tokens(text: str) -> int:
@@ -29,10 +30,11 @@ def extract_topic_header(text: str) -> str:
             return clean
     return "General Section"
 
-def chunk_documents(documents):
+def chunk_documents(documents, dedup=DEDUP_ENABLED):
     """
     Splits documents into chunks adhering to the 200-500 token limit.
     Enriches chunks with 'page' and 'topic' metadata.
+    Near-duplicate chunks are collapsed into one (see dedup.py) unless dedup=False.
     """
     if not documents:
         print("No documents provided to chunker.")
@@ -84,6 +86,10 @@ def chunk_documents(documents):
         new_doc = Document(page_content=chunk.page_content, metadata=meta)
         enhanced_chunks.append(new_doc)
 
+    # 3. Collapse near-duplicates (same paragraph reprinted across grades/editions)
+    if dedup:
+        enhanced_chunks = deduplicate_chunks(enhanced_chunks)
+
     print(f" Created {len(enhanced_chunks)} chunks.")
     print(f"   - Avg Size: ~400 tokens")
     print(f"   - Metadata: Page Numbers & Topics Preserved")
@@ -0,0 +1,142 @@
+import re
+import json
+import hashlib
+from collections import defaultdict
+import numpy as np
+from langchain_core.documents import Document
+from src.config import DEDUP_THRESHOLD, DEDUP_SHINGLE_SIZE, DEDUP_NUM_PERM, DEDUP_BANDS
+
+# Mersenne prime used by the MinHash permutations (a * x + b) mod p
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text, size=DEDUP_SHINGLE_SIZE):
+    """
+    Word n-grams of the normalized text (lowercase, punctuation dropped).
+    Chunks shorter than `size` words become a single shingle.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _shingle_hashes(shingle_set):
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingle_set],
+        dtype=np.uint64
+    )
+
+
+def _permutations(num_perm, seed=1):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    return a, b
+
+
+def minhash_signature(shingle_set, permutations):
+    """MinHash signature: for each permutation, the smallest permuted shingle hash."""
+    a, b = permutations
+    if not shingle_set:
+        return np.full(len(a), _MAX_HASH, dtype=np.uint64)
+    hashes = _shingle_hashes(shingle_set)
+    permuted = np.bitwise_and((np.outer(hashes, a) + b) % _MERSENNE_PRIME, _MAX_HASH)
+    return permuted.min(axis=0)
+
+
+def jaccard(set_a, set_b):
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def find_duplicate_groups(texts, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS):
+    """
+    Groups near-identical texts.
+
+    MinHash + LSH banding proposes candidate pairs (texts sharing at least one
+    identical band of their signature), then each candidate pair is confirmed with
+    the exact Jaccard similarity of the shingle sets.
+
+    Returns:
+        list: Groups of indices into `texts`, each sorted ascending. Singletons included.
+    """
+    rows = num_perm // bands
+    permutations = _permutations(rows * bands)
+    shingle_sets = [shingles(t) for t in texts]
+    signatures = [minhash_signature(s, permutations) for s in shingle_sets]
+
+    # Union-Find over confirmed near-duplicate pairs
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, sig in enumerate(signatures):
+            buckets[sig[band * rows:(band + 1) * rows].tobytes()].append(i)
+
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if find(i) != find(j) and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                        parent[max(find(i), find(j))] = min(find(i), find(j))
+
+    groups = defaultdict(list)
+    for i in range(len(texts)):
+        groups[find(i)].append(i)
+    return sorted(groups.values())
+
+
+def deduplicate_chunks(chunks, threshold=DEDUP_THRESHOLD):
+    """
+    Collapses near-duplicate chunks (e.g. the same paragraph reprinted across
+    grades or editions) into one canonical chunk.
+
+    The canonical chunk is the first occurrence. Its metadata gains:
+      - 'references': JSON list of every {"source", "page"} the text appeared at,
+      - 'duplicates': how many chunks were folded into it.
+
+    Returns:
+        List[Document]: The deduplicated chunks, in original order.
+    """
+    if not chunks:
+        return []
+
+    groups = find_duplicate_groups([c.page_content for c in chunks], threshold=threshold)
+
+    deduped = []
+    for group in groups:
+        canonical = chunks[group[0]]
+        meta = canonical.metadata.copy()
+
+        references = []
+        for i in group:
+            ref = {"source": chunks[i].metadata.get("source", "Unknown"), "page": chunks[i].metadata.get("page", "Unknown")}
+            if ref not in references:
+                references.append(ref)
+
+        # Chroma metadata values must be scalars, so the list is stored as JSON
+        meta["references"] = json.dumps(references)
+        meta["duplicates"] = len(group) - 1
+        deduped.append(Document(page_content=canonical.page_content, metadata=meta))
+
+    removed = len(chunks) - len(deduped)
+    tokens_before = sum(c.metadata.get("token_count", 0) for c in chunks)
+    tokens_after = sum(c.metadata.get("token_count", 0) for c in deduped)
+    print(f" Near-duplicate removal: {len(chunks)} -> {len(deduped)} chunks "
+          f"({removed} collapsed, {removed / len(chunks):.1%} smaller index, "
+          f"~{tokens_before - tokens_after} tokens not embedded)")
+
+    return deduped
@@ -0,0 +1,310 @@
+import os
+import re
+import time
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from langchain_core.documents import Document
+from src.config import PDF_BACKEND, EXTRACTION_WORKERS, PAGE_CACHE_DIR, HEADER_FOOTER_MIN_RATIO
+
+# Bump when the extraction/cleaning logic changes, so old cached pages are ignored.
+EXTRACTOR_VERSION = 3
+
+BACKENDS = ("pypdf", "pymupdf")
+
+# How many lines at the top and bottom of a page are considered header/footer candidates
+EDGE_LINES = 3
+
+
+# --- Backends (run inside worker processes) ---
+
+def _open_pymupdf():
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise ImportError("PDF_BACKEND='pymupdf' needs PyMuPDF. Install it with: pip install pymupdf")
+    return fitz
+
+
+def _column_ordered_text(page):
+    """
+    Layout-aware reading order for PyMuPDF pages.
+    Text blocks are grouped into left column, right column and full-width blocks,
+    so two-column textbook pages are read column by column instead of line by line
+    across both columns.
+    """
+    mid = page.rect.width / 2
+    blocks = [b for b in page.get_text("blocks", sort=True) if b[6] == 0]  # text blocks only
+
+    parts, left, right = [], [], []
+    for x0, y0, x1, y1, text, _, _ in blocks:
+        if x1 <= mid + 10:
+            left.append(text)
+        elif x0 >= mid - 10:
+            right.append(text)
+        else:
+            # Full-width block (heading, table, figure caption): flush the columns above it
+            parts.extend(left + right)
+            left, right = [], []
+            parts.append(text)
+    parts.extend(left + right)
+    return "\n".join(p.strip() for p in parts if p.strip())
+
+
+def _extract_batch(file_path, page_numbers, backend):
+    """Extracts raw text for some pages of one PDF. Top-level so worker processes can pickle it."""
+    if backend == "pymupdf":
+        fitz = _open_pymupdf()
+        with fitz.open(file_path) as pdf:
+            return [(n, _column_ordered_text(pdf[n])) for n in page_numbers]
+
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    return [(n, reader.pages[n].extract_text() or "") for n in page_numbers]
+
+
+def _page_count(file_path, backend):
+    if backend == "pymupdf":
+        fitz = _open_pymupdf()
+        with fitz.open(file_path) as pdf:
+            return pdf.page_count
+
+    from pypdf import PdfReader
+    return len(PdfReader(file_path).pages)
+
+
+# --- Page Cache ---
+
+def file_hash(file_path):
+    """SHA-256 of the file contents (streamed, so large PDFs don't load into memory)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, digest, backend, page_number):
+    return os.path.join(cache_dir, digest, f"{backend}-v{EXTRACTOR_VERSION}", f"{page_number}.txt")
+
+
+def _read_cached(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)  # atomic, so a crashed run never leaves a half-written page
+
+
+# --- Cleaning ---
+
+def _clean_page_text(text):
+    """
+    Repairs common extraction noise in NCERT PDFs:
+    - shadowed headings extracted several times, back to back ("Activity 2.4Activity 2.4Activity 2.4"),
+    - bullet glyphs extracted as "/square6",
+    - chemical formulas split into one subscript per line ("H\\n2" -> "H2").
+    """
+    # Only back-to-back copies with no separator: "solution solution solution" in a table is real text
+    # (the unit starts after whitespace, so rotations like "olution s" or "5 12." can't match either).
+    text = re.sub(r"(?<!\S)(\S.{2,78}?\S)\1{2,}", r"\1", text)
+    text = re.sub(r"/square\d+", "-", text)  # bullet glyphs that come out as their font name
+    lines = text.split("\n")
+    merged = []
+    for line in lines:
+        stripped = line.strip()
+        previous = merged[-1].split()[-1] if merged and merged[-1].strip() else ""
+        # Only glue a lone digit/charge onto something that looks like a formula ("H", "SO", "Ca(OH)")
+        if re.fullmatch(r"[0-9+\-−]", stripped) and re.fullmatch(r"(?:[A-Z][a-z]?\d*|\(|\))+", previous):
+            merged[-1] = merged[-1].rstrip() + stripped
+        else:
+            merged.append(line)
+    return "\n".join(merged)
+
+
+def _edge_signature(line):
+    # Page numbers change on every page, so "Science 12" and "Science 13" must match
+    return re.sub(r"\d+", "#", line.strip().lower())
+
+
+def strip_repeated_edges(pages, min_ratio=HEADER_FOOTER_MIN_RATIO):
+    """
+    Removes running headers/footers: lines in the first/last EDGE_LINES lines
+    of a page that repeat (ignoring digits) on at least `min_ratio` of the pages
+    (or of the even/odd pages).
+
+    Args:
+        pages (list): Raw text per page.
+
+    Returns:
+        list: Cleaned text per page.
+    """
+    if len(pages) < 3:
+        return pages  # Too few pages to tell a header from content
+
+    # Books alternate headers ("Science 22" on even pages, "Acids, Bases and Salts 23" on odd ones),
+    # so repeats are also counted within the even and the odd pages separately.
+    counts = {"all": Counter(), 0: Counter(), 1: Counter()}
+    for i, text in enumerate(pages):
+        lines = [l for l in text.split("\n") if l.strip()]
+        edges = set(_edge_signature(l) for l in lines[:EDGE_LINES] + lines[-EDGE_LINES:])
+        counts["all"].update(edges)
+        counts[i % 2].update(edges)
+
+    repeated = set()
+    for group, size in (("all", len(pages)), (0, (len(pages) + 1) // 2), (1, len(pages) // 2)):
+        threshold = max(2, int(size * min_ratio))
+        repeated.update(sig for sig, n in counts[group].items() if n >= threshold)
+
+    cleaned = []
+    for text in pages:
+        lines = [l for l in text.split("\n") if l.strip()]
+        head, body, tail = lines[:EDGE_LINES], lines[EDGE_LINES:-EDGE_LINES], lines[-EDGE_LINES:]
+        if len(lines) <= 2 * EDGE_LINES:
+            head, body, tail = lines, [], []
+        keep = [l for l in head if _edge_signature(l) not in repeated] + body + \
+               [l for l in tail if _edge_signature(l) not in repeated]
+        cleaned.append("\n".join(keep))
+    return cleaned
+
+
+_LINE_BREAK_HYPHEN = re.compile(r"([A-Za-z]+)-\n\s*([a-z]+)")
+
+
+def rejoin_hyphenated(pages):
+    """
+    Repairs words hyphenated across a line break, using the whole document as a dictionary:
+    "reac-\ntion" becomes "reaction" only if "reaction" appears elsewhere in the document;
+    otherwise the hyphen is real and kept ("non-\nmetallic" -> "non-metallic").
+
+    Args:
+        pages (list): Text per page of ONE document.
+
+    Returns:
+        list: Text per page.
+    """
+    vocabulary = set()
+    for text in pages:
+        vocabulary.update(re.findall(r"[a-z]+", _LINE_BREAK_HYPHEN.sub(" ", text).lower()))
+
+    def join(match):
+        first, second = match.group(1), match.group(2)
+        if (first + second).lower() in vocabulary:
+            return first + second
+        return f"{first}-{second}"
+
+    return [_LINE_BREAK_HYPHEN.sub(join, text) for text in pages]
+
+
+# --- Engine ---
+
+def extract_pdf_pages(file_paths, backend=PDF_BACKEND, workers=EXTRACTION_WORKERS, cache_dir=PAGE_CACHE_DIR):
+    """
+    Extracts cleaned text from every page of the given PDFs.
+
+    Pages already in the on-disk cache (same file hash, page number and backend)
+    are reused; the rest are parsed in parallel worker processes.
+
+    Args:
+        file_paths (list): Paths of PDF files.
+        backend (str): "pypdf" or "pymupdf".
+        workers (int): Worker processes for parsing. 1 = no subprocesses.
+        cache_dir (str): Root folder of the page cache.
+
+    Returns:
+        List[Document]: One Document per page, with 'source', 'page' (0-based, like PyPDFLoader)
+                        and 'total_pages' metadata.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{backend}'. Choose one of {BACKENDS}.")
+
+    start_time = time.perf_counter()
+    raw_pages = {}  # file_path -> {page_number: text}
+    jobs = []       # (file_path, file hash, [page numbers]) still to extract
+    failed = set()  # files that could not be read; skipped like PyPDFLoader errors used to be
+    cached_count = 0
+
+    # 1. Cache lookup
+    for file_path in file_paths:
+        try:
+            digest = file_hash(file_path)
+            total = _page_count(file_path, backend)
+        except Exception as e:
+            print(f"Error loading {os.path.basename(file_path)}: {e}")
+            failed.add(file_path)
+            continue
+
+        raw_pages[file_path] = {}
+        missing = []
+        for n in range(total):
+            text = _read_cached(_cache_path(cache_dir, digest, backend, n))
+            if text is None:
+                missing.append(n)
+            else:
+                raw_pages[file_path][n] = text
+                cached_count += 1
+        if missing:
+            jobs.append((file_path, digest, missing))
+
+    # 2. Parallel extraction of the missing pages, in batches so each worker opens a PDF once per batch
+    batches = []
+    for file_path, digest, missing in jobs:
+        batch_size = max(1, -(-len(missing) // max(1, workers)))  # ceil: about one batch per worker
+        for i in range(0, len(missing), batch_size):
+            batches.append((file_path, digest, missing[i:i + batch_size]))
+
+    if batches:
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(batches) > 1 else None
+        try:
+            if pool:
+                pending = [(fp, digest, pool.submit(_extract_batch, fp, pages, backend))
+                           for fp, digest, pages in batches]
+            else:
+                pending = [(fp, digest, (pages,)) for fp, digest, pages in batches]
+
+            for file_path, digest, job in pending:
+                if file_path in failed:
+                    continue
+                try:
+                    extracted = job.result() if pool else _extract_batch(file_path, job[0], backend)
+                except Exception as e:
+                    print(f"Error loading {os.path.basename(file_path)}: {e}")
+                    failed.add(file_path)
+                    continue
+
+                for n, text in extracted:
+                    text = _clean_page_text(text)
+                    _write_cached(_cache_path(cache_dir, digest, backend, n), text)
+                    raw_pages[file_path][n] = text
+        finally:
+            if pool:
+                pool.shutdown()
+
+    # 3. Header/footer stripping and hyphen repair (both need all pages of a file), then Document creation
+    documents = []
+    for file_path in file_paths:
+        if file_path in failed:
+            continue
+        numbers = sorted(raw_pages[file_path])
+        cleaned = rejoin_hyphenated(strip_repeated_edges([raw_pages[file_path][n] for n in numbers]))
+        for n, text in zip(numbers, cleaned):
+            documents.append(Document(
+                page_content=text,
+                metadata={"source": file_path, "page": n, "total_pages": len(numbers)}
+            ))
+
+    elapsed = time.perf_counter() - start_time
+    extracted_count = len(documents) - cached_count
+    rate = len(documents) / elapsed if elapsed > 0 else 0.0
+    print(f" Extracted {len(documents)} pages ({extracted_count} parsed, {cached_count} from cache) "
+          f"in {elapsed:.2f}s -> {rate:.1f} pages/s [backend={backend}, workers={workers}]")
+
+    return documents
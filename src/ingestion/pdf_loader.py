@@ -1,17 +1,23 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader
-from src.config import DATA_DIR
+from src.ingestion.page_extractor import extract_pdf_pages
+from src.config import DATA_DIR, PDF_BACKEND, EXTRACTION_WORKERS, PAGE_CACHE_DIR
 
-def load_documents():
+def load_documents(backend=PDF_BACKEND, workers=EXTRACTION_WORKERS, cache_dir=PAGE_CACHE_DIR):
     """
     Scans the configured data directory and loads all PDF documents.
+
+    Pages are parsed in parallel and cached on disk per (file hash, page), so
+    re-ingesting only parses new or changed PDFs. Running headers/footers are removed.
+
+    Args:
+        backend (str): "pypdf" (default) or "pymupdf" (faster, column-aware).
+        workers (int): Number of worker processes used for parsing.
+        cache_dir (str): Root folder of the page cache (the benchmark points it at a fresh folder).
     
     Returns:
         List[Document]: A list of LangChain Document objects, where each object 
                         represents a page from a PDF with metadata (page number, source).
     """
-    documents = []
-    
     # 1. Validation: Ensure the directory exists to avoid cryptic errors later
     if not os.path.exists(DATA_DIR):
         raise FileNotFoundError(f"The directory {DATA_DIR} does not exist. Please create it and add your PDFs.")
@@ -25,16 +31,11 @@ def load_documents():
 
     print(f"Found {len(files)} PDF(s) in {DATA_DIR}...")
 
-    # 3. Loading: Process files one by one
+    # 3. Loading: Page-level parallel extraction (with cache)
     for filename in files:
-        file_path = os.path.join(DATA_DIR, filename)
-        try:
-            print(f" - Loading: {filename}")
-            loader = PyPDFLoader(file_path)
-            docs = loader.load()
-            documents.extend(docs)
-        except Exception as e:
-            print(f"Error loading {filename}: {e}")
+        print(f" - Loading: {filename}")
+    file_paths = [os.path.join(DATA_DIR, filename) for filename in files]
+    documents = extract_pdf_pages(file_paths, backend=backend, workers=workers, cache_dir=cache_dir)
 
     print(f"Successfully loaded {len(documents)} pages in total.")
     return documents
\ No newline at end of file
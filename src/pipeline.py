@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+from src.ingestion.pdf_loader import load_documents
+from src.ingestion.chunker import chunk_documents
+from src.database.vector_store import create_vector_db
+from src.agents.router import route_query, is_small_talk, is_follow_up
+from src.agents.concept_agent import generate_explanation
+from src.agents.quiz_agent import generate_quiz
+from src.agents.prompts import NOT_IN_NOTES_RESPONSE, CHAT_RESPONSE
+from src.config import DB_DIR
+
+
+def ensure_knowledge_base():
+    """
+    Checks if the Vector DB exists. If not, builds it from scratch.
+    """
+    if os.path.exists(DB_DIR) and os.listdir(DB_DIR):
+        print(f"Knowledge Base found in {DB_DIR}. Skipping ingestion.")
+        return
+
+    print("No Knowledge Base found. Starting Ingestion Pipeline...")
+
+    # Step 1: Load
+    documents = load_documents()
+    if not documents:
+        print("CRITICAL ERROR: No PDFs found in data/raw/. Please add a file.")
+        sys.exit(1)
+
+    # Step 2: Intelligent Chunking (Token-based + Metadata)
+    chunks = chunk_documents(documents)
+
+    # Step 3: Store in Vector DB
+    create_vector_db(chunks)
+    print("Ingestion Complete. Database built.")
+
+
+def references(doc):
+    """
+    Every (source, page) a chunk's text appeared at. Deduplicated chunks carry them in
+    their 'references' metadata (see src/ingestion/dedup.py); other chunks have just one.
+    """
+    if doc.metadata.get("references"):
+        return json.loads(doc.metadata["references"])
+    return [{"source": doc.metadata.get("source", "Unknown"), "page": doc.metadata.get("page", "Unknown")}]
+
+
+def citation(doc):
+    """
+    Human-readable citation for a chunk, grouped by file:
+    "chap2.pdf, Page 4" or "chap2.pdf, Pages 4, 9; chap3.pdf, Page 1".
+    """
+    pages_by_file = {}
+    for ref in references(doc):
+        pages = pages_by_file.setdefault(os.path.basename(str(ref.get("source", "Unknown"))), [])
+        page = str(ref.get("page", "Unknown"))
+        if page not in pages:
+            pages.append(page)
+    return "; ".join(
+        f"{name}, {'Pages' if len(pages) > 1 else 'Page'} {', '.join(pages)}"
+        for name, pages in pages_by_file.items()
+    )
+
+
+def format_docs_for_agent(docs):
+    """
+    Prepares retrieved documents for the LLM.
+    """
+    return "\n\n".join([f"Content: {d.page_content}\nSource: {citation(d)}" for d in docs])
+
+
+def describe_sources(docs):
+    """Source attribution for the front ends: one entry per retrieved chunk."""
+    return [{
+        "page": doc.metadata.get("page", "Unknown"),
+        "citation": citation(doc),
+        "topic": doc.metadata.get("topic", "General"),
+        "preview": doc.page_content[:100].replace("\n", " ")
+    } for doc in docs]
+
+
+def last_topic(history):
+    """The student's previous question, or the rolling summary if it is all that's left."""
+    for role, message in reversed(history):
+        if role == "Student":
+            return message
+    return history[-1][1] if history else ""
+
+
+def answer_query(retriever, query, history, timings=None):
+    """
+    Runs one student turn: Hybrid Retrieval -> Intent Routing -> Concept/Quiz Agent.
+    Shared by the CLI, the Streamlit app, the API server and the benchmark.
+
+    Args:
+        retriever: Any LangChain retriever (see src/database/retriever.py).
+        query (str): The student's message.
+        history (list): (role, message) pairs from ConversationMemory.get_history().
+        timings (dict): Optional. Seconds spent per stage are appended to
+                        timings["retrieve"], ["route"] and ["generate"] (used by the benchmark).
+
+    Returns:
+        tuple: (intent, response, retrieved_docs). intent is "QUIZ", "CHAT" or "EXPLAIN";
+               response is a list of questions for QUIZ, otherwise a string.
+    """
+    def record(stage, start_time):
+        if timings is not None:
+            timings.setdefault(stage, []).append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    retrieved_docs = retriever.invoke(query)
+    # A follow-up ("Explain that again") names no topic, so adaptive retrieval finds nothing
+    # for it: search again with the topic it refers to, taken from the history.
+    if not retrieved_docs and history and is_follow_up(query):
+        retrieved_docs = retriever.invoke(f"{last_topic(history)} {query}")
+    record("retrieve", start_time)
+
+    # Nothing relevant in the notes (adaptive retrieval early exit): skip both LLM calls.
+    # Greetings never match the notes, so they are caught here without the router.
+    if not retrieved_docs:
+        if is_small_talk(query):
+            return "CHAT", CHAT_RESPONSE, retrieved_docs
+        return "EXPLAIN", NOT_IN_NOTES_RESPONSE, retrieved_docs
+
+    context_text = format_docs_for_agent(retrieved_docs)
+
+    start_time = time.perf_counter()
+    intent = route_query(query).strip().upper()
+    record("route", start_time)
+
+    start_time = time.perf_counter()
+    if "QUIZ" in intent:
+        intent, response = "QUIZ", generate_quiz(query, context_text)
+    elif "CHAT" in intent:
+        # Simple conversational fallback
+        intent, response = "CHAT", CHAT_RESPONSE
+    else:
+        # Default to EXPLAIN
+        intent, response = "EXPLAIN", generate_explanation(query, context_text, history)
+    record("generate", start_time)
+
+    return intent, response, retrieved_docs